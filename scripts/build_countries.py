@@ -21,9 +21,9 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
-    base = json.loads(Path(args.base).read_text())
-    cpi = json.loads(Path(args.cpi).read_text())
-    rates = json.loads(Path(args.rates).read_text())
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    cpi = json.loads(Path(args.cpi).read_text(encoding="utf-8"))
+    rates = json.loads(Path(args.rates).read_text(encoding="utf-8"))
 
     result = {
         "source": "IMF data.imf.org",
@@ -34,30 +34,36 @@ def main() -> None:
     inflation_only = []
     with_rates = []
 
+    cpi_get = cpi.get
+    rates_get = rates.get
+    append_country = result["countries"].append
+
     for country in base.get("countries", []):
-        country_id = country.get("id")
-        cpi_data = cpi.get(country_id)
+        country_id = country["id"]
+        cpi_data = cpi_get(country_id)
         if not cpi_data:
             dropped_no_cpi.append(country_id)
             continue
 
-        rate_data = rates.get(country_id)
+        rate_data = rates_get(country_id)
         clean = {
             "id": country_id,
-            "name": country.get("name"),
-            "currencyCode": country.get("currencyCode"),
-            "currencySymbol": country.get("currencySymbol"),
+            "name": country["name"],
+            "currencyCode": country["currencyCode"],
+            "currencySymbol": country["currencySymbol"],
             "cpi": cpi_data,
             "rate": rate_data if rate_data else None,
         }
-        result["countries"].append(clean)
+        append_country(clean)
 
         if clean["rate"] is None:
             inflation_only.append(country_id)
         else:
             with_rates.append(country_id)
 
-    Path(args.out).write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
+    with Path(args.out).open("w", encoding="utf-8") as handle:
+        json.dump(result, handle, ensure_ascii=False, indent=2)
+        handle.write("\n")
 
     print(f"Total output countries: {len(result['countries'])}")
     print(f"With rate data: {len(with_rates)} -> {', '.join(with_rates)}")
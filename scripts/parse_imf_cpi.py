@@ -9,6 +9,9 @@ Rules:
   - latest = last available value/date
   - previous = latest value from about one year earlier (<= latest-12 months)
 - If latest date is older than 2023, output null for that country.
+
+Each CSV record must fit on one physical line (no quoted newlines); lines are
+pre-filtered and split into byte ranges before CSV parsing.
 """
 
 from __future__ import annotations
@@ -16,10 +19,13 @@ from __future__ import annotations
 import argparse
 import csv
 import json
-import re
-from dataclasses import dataclass
+import multiprocessing
+import os
+from functools import lru_cache
+from math import isfinite
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
 
 
 ISO3_TO_ISO2 = {
@@ -50,18 +56,26 @@ ISO3_TO_ISO2 = {
     "ZAF": "ZA",
 }
 
+ISO3_INDEX = {iso3: i for i, iso3 in enumerate(ISO3_TO_ISO2)}
+ISO3_PREFIXES = tuple(iso3 + "." for iso3 in ISO3_TO_ISO2)
+
 FREQ_PRIORITY = {"Monthly": 3, "Quarterly": 2, "Annual": 1}
 
+# Time cells starting with anything else (e.g. "NA") are skipped without calling float().
+# Leading whitespace is let through because float() accepts it.
+NUMBER_START_CHARS = "0123456789+-. \t"
+
+# Smaller inputs are scanned in-process; a worker pool would cost more than it saves.
+MIN_BYTES_PER_JOB = 4 * 1024 * 1024
+
 
-@dataclass
-class Point:
+class Point(NamedTuple):
     value: float
     period: str
     period_sort: int
 
 
-@dataclass
-class Candidate:
+class Candidate(NamedTuple):
     latest: Point
     previous: Optional[Point]
     freq_priority: int
@@ -71,22 +85,28 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Parse IMF CPI CSV into per-country latest and prior values.")
     parser.add_argument("--csv", required=True, help="Path to IMF CPI CSV file")
     parser.add_argument("--out", required=True, help="Output JSON path")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes for scanning the CSV")
     return parser.parse_args()
 
 
 def parse_period_key(period_key: str) -> Optional[Tuple[int, int]]:
-    monthly = re.fullmatch(r"(\d{4})-M(0[1-9]|1[0-2])", period_key)
-    if monthly:
-        return int(monthly.group(1)), int(monthly.group(2))
-    quarterly = re.fullmatch(r"(\d{4})-Q([1-4])", period_key)
-    if quarterly:
-        return int(quarterly.group(1)), int(quarterly.group(2)) * 3
-    annual = re.fullmatch(r"(\d{4})", period_key)
-    if annual:
-        return int(annual.group(1)), 12
+    # Period headers look like "YYYY", "YYYY-Qn" or "YYYY-Mnn".
+    year = period_key[:4]
+    if len(year) != 4 or not year.isdecimal():
+        return None
+    suffix = period_key[4:]
+    if not suffix:
+        return int(year), 12
+    if len(suffix) == 4 and suffix[:2] == "-M" and suffix[2:].isdecimal():
+        month = int(suffix[2:])
+        if 1 <= month <= 12:
+            return int(year), month
+    elif len(suffix) == 3 and suffix[:2] == "-Q" and suffix[2] in "1234":
+        return int(year), int(suffix[2]) * 3
     return None
 
 
+@lru_cache(maxsize=None)
 def period_sort_key(period_key: str) -> Optional[int]:
     parsed = parse_period_key(period_key)
     if not parsed:
@@ -95,86 +115,186 @@ def period_sort_key(period_key: str) -> Optional[int]:
     return year * 12 + month
 
 
-def extract_points(row: dict, time_columns: list[str]) -> list[Point]:
-    points: list[Point] = []
-    for col in time_columns:
-        raw = (row.get(col) or "").strip()
-        if not raw:
+def latest_and_prior(row: list[str], time_meta: list[tuple[int, str, int]]) -> Optional[Tuple[Point, Optional[Point]]]:
+    # time_meta is sorted oldest first; walk it backwards so the latest value
+    # and the one a year before it are found without collecting every point.
+    latest: Optional[Point] = None
+    target_sort = 0
+    for col_index, col, sort_key in reversed(time_meta):
+        if latest is not None and sort_key > target_sort:
+            continue
+        raw = row[col_index]
+        if not raw or raw[0] not in NUMBER_START_CHARS:
             continue
         try:
             value = float(raw)
         except ValueError:
             continue
-        sort_key = period_sort_key(col)
-        if sort_key is None:
+        if not isfinite(value):
             continue
-        points.append(Point(value=value, period=col, period_sort=sort_key))
-    points.sort(key=lambda p: p.period_sort)
-    return points
-
-
-def row_candidate(points: list[Point]) -> Optional[Candidate]:
-    if not points:
+        point = Point(value, col, sort_key)
+        if latest is not None:
+            return latest, point
+        latest = point
+        target_sort = sort_key - 12
+    if latest is None:
         return None
-    latest = points[-1]
-    target_sort = latest.period_sort - 12
-    previous_candidates = [p for p in points if p.period_sort <= target_sort]
-    previous = previous_candidates[-1] if previous_candidates else None
-    return Candidate(latest=latest, previous=previous, freq_priority=0)
+    return latest, None
 
 
 def pick_better(current: Optional[Candidate], candidate: Candidate) -> Candidate:
     if current is None:
         return candidate
-    current_score = (
-        current.latest.period_sort,
-        current.freq_priority,
-        1 if current.previous is not None else 0,
-    )
-    candidate_score = (
-        candidate.latest.period_sort,
-        candidate.freq_priority,
-        1 if candidate.previous is not None else 0,
-    )
-    return candidate if candidate_score > current_score else current
+    if candidate.latest.period_sort != current.latest.period_sort:
+        return candidate if candidate.latest.period_sort > current.latest.period_sort else current
+    if candidate.freq_priority != current.freq_priority:
+        return candidate if candidate.freq_priority > current.freq_priority else current
+    return candidate if candidate.previous is not None and current.previous is None else current
+
+
+def read_header(csv_path: Path) -> Tuple[list[str], int]:
+    with csv_path.open("rb") as handle:
+        header_line = handle.readline().decode("utf-8")
+        return next(csv.reader([header_line]), []), handle.tell()
+
+
+def byte_ranges(start: int, end: int, parts: int) -> list[Tuple[int, int]]:
+    bounds = [start + (end - start) * i // parts for i in range(parts + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def iter_lines(csv_path: Path, start: int, end: int) -> Iterator[str]:
+    # A range owns every line that starts inside it; back up one byte so a line
+    # beginning exactly at `start` is not skipped as a partial line. Ranges are
+    # cut on physical lines, so CSV records must not contain quoted newlines: a
+    # record straddling a boundary would be split into two malformed rows.
+    with csv_path.open("rb") as handle:
+        if start:
+            handle.seek(start - 1)
+            handle.readline()
+        while handle.tell() < end:
+            line = handle.readline()
+            if not line:
+                break
+            yield line.decode("utf-8")
+
+
+def headline_lines(lines: Iterator[str]) -> Iterator[str]:
+    # Cheap substring test on the raw line so most non-headline rows are never
+    # split into fields. This relies on one record per line: a quoted newline
+    # would leave part of a record behind, so an unbalanced quote is an error
+    # rather than a silently dropped country.
+    for line in lines:
+        if "All Items" in line and "Index" in line:
+            if line.count('"') % 2:
+                raise ValueError(f"CSV record spans multiple lines, which is not supported: {line[:80]!r}")
+            yield line
+
+
+def scan_range(
+    csv_path: Path,
+    start: int,
+    end: int,
+    width: int,
+    key_columns: Tuple[int, int, int, int],
+    time_meta: list[tuple[int, str, int]],
+) -> Dict[str, Optional[Candidate]]:
+    key_fields = itemgetter(*key_columns)
+    # Best row so far per country, as parallel lists indexed by ISO3_INDEX.
+    # Candidates are only built once the range is done.
+    best_sort = [-1] * len(ISO3_INDEX)
+    best_freq = [0] * len(ISO3_INDEX)
+    best_latest: list[Optional[Point]] = [None] * len(ISO3_INDEX)
+    best_previous: list[Optional[Point]] = [None] * len(ISO3_INDEX)
+
+    for row in csv.reader(headline_lines(iter_lines(csv_path, start, end))):
+        if len(row) < width:
+            row.extend([""] * (width - len(row)))
+        series_code, coicop, transformation, freq = key_fields(row)
+        if coicop.strip() != "All Items":
+            continue
+        if transformation.strip() != "Index":
+            continue
 
+        series_code = series_code.strip()
+        if not series_code.startswith(ISO3_PREFIXES):
+            continue
+        i = ISO3_INDEX[series_code[:3]]
 
-def main() -> None:
-    args = parse_args()
-    csv_path = Path(args.csv)
-    out_path = Path(args.out)
+        freq_pri = FREQ_PRIORITY.get(freq.strip(), 0)
+        if freq_pri == 0:
+            continue
 
-    with csv_path.open(newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        fieldnames = reader.fieldnames or []
-        time_columns = [c for c in fieldnames if period_sort_key(c) is not None]
-        best_by_country: Dict[str, Optional[Candidate]] = {k: None for k in ISO3_TO_ISO2.values()}
+        points = latest_and_prior(row, time_meta)
+        if points is None:
+            continue
+        latest, previous = points
 
-        for row in reader:
-            series_code = (row.get("SERIES_CODE") or "").strip()
-            if "." not in series_code:
+        # Same ordering as pick_better: period, then frequency, then having a prior value.
+        if latest.period_sort < best_sort[i]:
+            continue
+        if latest.period_sort == best_sort[i]:
+            if freq_pri < best_freq[i]:
                 continue
-            iso3 = series_code.split(".", 1)[0].upper()
-            iso2 = ISO3_TO_ISO2.get(iso3)
-            if not iso2:
+            if freq_pri == best_freq[i] and (previous is None or best_previous[i] is not None):
                 continue
+        best_sort[i] = latest.period_sort
+        best_freq[i] = freq_pri
+        best_latest[i] = latest
+        best_previous[i] = previous
+
+    best_by_country: Dict[str, Optional[Candidate]] = {}
+    for i, iso2 in enumerate(ISO3_TO_ISO2.values()):
+        latest = best_latest[i]
+        if latest is None:
+            best_by_country[iso2] = None
+            continue
+        best_by_country[iso2] = Candidate(latest=latest, previous=best_previous[i], freq_priority=best_freq[i])
+    return best_by_country
 
-            if (row.get("COICOP_1999") or "").strip() != "All Items":
-                continue
-            if (row.get("TYPE_OF_TRANSFORMATION") or "").strip() != "Index":
-                continue
 
-            freq = (row.get("FREQUENCY") or "").strip()
-            freq_pri = FREQ_PRIORITY.get(freq, 0)
-            if freq_pri == 0:
-                continue
+def main() -> None:
+    args = parse_args()
+    csv_path = Path(args.csv)
+    out_path = Path(args.out)
 
-            points = extract_points(row, time_columns)
-            candidate = row_candidate(points)
-            if candidate is None:
-                continue
-            candidate.freq_priority = freq_pri
-            best_by_country[iso2] = pick_better(best_by_country[iso2], candidate)
+    header, data_start = read_header(csv_path)
+    # Missing columns read as an empty cell just past the header, so rows
+    # without them are skipped the way DictReader's empty restval did.
+    missing_i = len(header)
+    col_index = {name: i for i, name in enumerate(header)}
+    key_columns = (
+        col_index.get("SERIES_CODE", missing_i),
+        col_index.get("COICOP_1999", missing_i),
+        col_index.get("TYPE_OF_TRANSFORMATION", missing_i),
+        col_index.get("FREQUENCY", missing_i),
+    )
+    width = len(header) + (1 if missing_i in key_columns else 0)
+    time_meta: list[tuple[int, str, int]] = []
+    for i, c in enumerate(header):
+        sort_key = period_sort_key(c)
+        if sort_key is not None:
+            time_meta.append((i, c, sort_key))
+    time_meta.sort(key=lambda meta: meta[2])
+
+    data_end = csv_path.stat().st_size
+    jobs = max(1, min(args.jobs, (data_end - data_start) // MIN_BYTES_PER_JOB))
+    tasks = [
+        (csv_path, start, end, width, key_columns, time_meta)
+        for start, end in byte_ranges(data_start, data_end, jobs)
+    ]
+    if jobs == 1:
+        partials = [scan_range(*tasks[0])]
+    else:
+        with multiprocessing.Pool(jobs) as pool:
+            partials = pool.starmap(scan_range, tasks)
+
+    # Merge in file order so ties resolve to the earliest row, as a single scan would.
+    best_by_country: Dict[str, Optional[Candidate]] = {k: None for k in ISO3_TO_ISO2.values()}
+    for partial in partials:
+        for iso2, candidate in partial.items():
+            if candidate is not None:
+                best_by_country[iso2] = pick_better(best_by_country[iso2], candidate)
 
     output: Dict[str, Optional[dict]] = {}
     for iso2, candidate in best_by_country.items():
@@ -194,7 +314,9 @@ def main() -> None:
             "previousDate": candidate.previous.period,
         }
 
-    out_path.write_text(json.dumps(output, ensure_ascii=False, indent=2) + "\n")
+    with out_path.open("w", encoding="utf-8") as handle:
+        json.dump(output, handle, ensure_ascii=False, indent=2)
+        handle.write("\n")
     covered = sum(1 for v in output.values() if v is not None)
     print(f"Countries with CPI data: {covered}/{len(output)}")
     print(f"Wrote: {out_path}")
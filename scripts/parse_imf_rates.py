@@ -8,6 +8,9 @@ Rules:
 - Prefer indicator "Monetary policy-related" > "Discount Rate" > other.
 - For each candidate row, take latest non-empty time value.
 - If latest date is older than 2023, output null for that country.
+
+Each CSV record must fit on one physical line (no quoted newlines); the file
+is split into byte ranges on line boundaries before CSV parsing.
 """
 
 from __future__ import annotations
@@ -15,10 +18,13 @@ from __future__ import annotations
 import argparse
 import csv
 import json
-import re
-from dataclasses import dataclass
+import multiprocessing
+import os
+from functools import lru_cache
+from math import isfinite
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
 
 
 ISO3_TO_ISO2 = {
@@ -49,11 +55,20 @@ ISO3_TO_ISO2 = {
     "ZAF": "ZA",
 }
 
+ISO3_INDEX = {iso3: i for i, iso3 in enumerate(ISO3_TO_ISO2)}
+ISO3_PREFIXES = tuple(iso3 + "." for iso3 in ISO3_TO_ISO2)
+
 FREQ_PRIORITY = {"Monthly": 3, "Quarterly": 2, "Annual": 1}
 
+# Time cells starting with anything else (e.g. "NA") are skipped without calling float().
+# Leading whitespace is let through because float() accepts it.
+NUMBER_START_CHARS = "0123456789+-. \t"
+
+# Smaller inputs are scanned in-process; a worker pool would cost more than it saves.
+MIN_BYTES_PER_JOB = 4 * 1024 * 1024
+
 
-@dataclass
-class Candidate:
+class Candidate(NamedTuple):
     value: float
     period: str
     period_sort: int
@@ -65,30 +80,28 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Parse IMF rates CSV into per-country latest values.")
     parser.add_argument("--csv", required=True, help="Path to IMF MFS_IR CSV file")
     parser.add_argument("--out", required=True, help="Output JSON path")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes for scanning the CSV")
     return parser.parse_args()
 
 
 def parse_period_key(period_key: str) -> Optional[Tuple[int, int]]:
-    monthly = re.fullmatch(r"(\d{4})-M(0[1-9]|1[0-2])", period_key)
-    if monthly:
-        year = int(monthly.group(1))
-        month = int(monthly.group(2))
-        return year, month
-
-    quarterly = re.fullmatch(r"(\d{4})-Q([1-4])", period_key)
-    if quarterly:
-        year = int(quarterly.group(1))
-        q = int(quarterly.group(2))
-        return year, q * 3
-
-    annual = re.fullmatch(r"(\d{4})", period_key)
-    if annual:
-        year = int(annual.group(1))
-        return year, 12
-
+    # Period headers look like "YYYY", "YYYY-Qn" or "YYYY-Mnn".
+    year = period_key[:4]
+    if len(year) != 4 or not year.isdecimal():
+        return None
+    suffix = period_key[4:]
+    if not suffix:
+        return int(year), 12
+    if len(suffix) == 4 and suffix[:2] == "-M" and suffix[2:].isdecimal():
+        month = int(suffix[2:])
+        if 1 <= month <= 12:
+            return int(year), month
+    elif len(suffix) == 3 and suffix[:2] == "-Q" and suffix[2] in "1234":
+        return int(year), int(suffix[2]) * 3
     return None
 
 
+@lru_cache(maxsize=None)
 def period_sort_key(period_key: str) -> Optional[int]:
     parsed = parse_period_key(period_key)
     if not parsed:
@@ -106,78 +119,166 @@ def indicator_priority(indicator: str) -> int:
     return 1
 
 
-def latest_value_in_row(row: dict, time_columns: list[str]) -> Optional[Tuple[float, str, int]]:
-    latest: Optional[Tuple[float, str, int]] = None
-    for col in time_columns:
-        raw = (row.get(col) or "").strip()
-        if not raw:
+def latest_value_in_row(row: list[str], time_meta: list[tuple[int, str, int]]) -> Optional[Tuple[float, str, int]]:
+    # time_meta is sorted newest first, so the first usable cell is the latest.
+    for col_index, col, sort_key in time_meta:
+        raw = row[col_index]
+        if not raw or raw[0] not in NUMBER_START_CHARS:
             continue
         try:
             val = float(raw)
         except ValueError:
             continue
-        sort_key = period_sort_key(col)
-        if sort_key is None:
+        if not isfinite(val):
             continue
-        if latest is None or sort_key > latest[2]:
-            latest = (val, col, sort_key)
-    return latest
+        return val, col, sort_key
+    return None
 
 
 def pick_better(current: Optional[Candidate], candidate: Candidate) -> Candidate:
     if current is None:
         return candidate
-    current_score = (
-        current.period_sort,
-        current.freq_priority,
-        current.indicator_priority,
-    )
-    candidate_score = (
-        candidate.period_sort,
-        candidate.freq_priority,
-        candidate.indicator_priority,
-    )
-    return candidate if candidate_score > current_score else current
-
+    if candidate.period_sort != current.period_sort:
+        return candidate if candidate.period_sort > current.period_sort else current
+    if candidate.freq_priority != current.freq_priority:
+        return candidate if candidate.freq_priority > current.freq_priority else current
+    return candidate if candidate.indicator_priority > current.indicator_priority else current
+
+
+def read_header(csv_path: Path) -> Tuple[list[str], int]:
+    with csv_path.open("rb") as handle:
+        header_line = handle.readline().decode("utf-8")
+        return next(csv.reader([header_line]), []), handle.tell()
+
+
+def byte_ranges(start: int, end: int, parts: int) -> list[Tuple[int, int]]:
+    bounds = [start + (end - start) * i // parts for i in range(parts + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def iter_lines(csv_path: Path, start: int, end: int) -> Iterator[str]:
+    # A range owns every line that starts inside it; back up one byte so a line
+    # beginning exactly at `start` is not skipped as a partial line. Ranges are
+    # cut on physical lines, so CSV records must not contain quoted newlines: a
+    # record straddling a boundary would be split into two malformed rows.
+    with csv_path.open("rb") as handle:
+        if start:
+            handle.seek(start - 1)
+            handle.readline()
+        while handle.tell() < end:
+            line = handle.readline()
+            if not line:
+                break
+            yield line.decode("utf-8")
+
+
+def scan_range(
+    csv_path: Path,
+    start: int,
+    end: int,
+    width: int,
+    key_columns: Tuple[int, int, int],
+    time_meta: list[tuple[int, str, int]],
+) -> Dict[str, Optional[Candidate]]:
+    key_fields = itemgetter(*key_columns)
+    # Best row so far per country, as parallel lists indexed by ISO3_INDEX.
+    # Candidates are only built once the range is done.
+    best_sort = [-1] * len(ISO3_INDEX)
+    best_freq = [0] * len(ISO3_INDEX)
+    best_indicator = [0] * len(ISO3_INDEX)
+    best_value = [0.0] * len(ISO3_INDEX)
+    best_period: list[Optional[str]] = [None] * len(ISO3_INDEX)
+
+    for row in csv.reader(iter_lines(csv_path, start, end)):
+        if len(row) < width:
+            row.extend([""] * (width - len(row)))
+        series_code, freq, indicator = key_fields(row)
+        series_code = series_code.strip()
+        if not series_code.startswith(ISO3_PREFIXES):
+            continue
+        i = ISO3_INDEX[series_code[:3]]
 
-def main() -> None:
-    args = parse_args()
-    csv_path = Path(args.csv)
-    out_path = Path(args.out)
+        freq_pri = FREQ_PRIORITY.get(freq.strip(), 0)
+        if freq_pri == 0:
+            continue
 
-    with csv_path.open(newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        fieldnames = reader.fieldnames or []
-        time_columns = [c for c in fieldnames if period_sort_key(c) is not None]
-        best_by_country: Dict[str, Optional[Candidate]] = {k: None for k in ISO3_TO_ISO2.values()}
+        latest = latest_value_in_row(row, time_meta)
+        if latest is None:
+            continue
 
-        for row in reader:
-            series_code = (row.get("SERIES_CODE") or "").strip()
-            if "." not in series_code:
+        # Same ordering as pick_better: period, then frequency, then indicator.
+        value, period, period_sort = latest
+        if period_sort < best_sort[i]:
+            continue
+        indicator_pri = indicator_priority(indicator)
+        if period_sort == best_sort[i]:
+            if freq_pri < best_freq[i]:
                 continue
-            iso3 = series_code.split(".", 1)[0].upper()
-            iso2 = ISO3_TO_ISO2.get(iso3)
-            if not iso2:
+            if freq_pri == best_freq[i] and indicator_pri <= best_indicator[i]:
                 continue
+        best_sort[i] = period_sort
+        best_freq[i] = freq_pri
+        best_indicator[i] = indicator_pri
+        best_value[i] = value
+        best_period[i] = period
+
+    best_by_country: Dict[str, Optional[Candidate]] = {}
+    for i, iso2 in enumerate(ISO3_TO_ISO2.values()):
+        period = best_period[i]
+        if period is None:
+            best_by_country[iso2] = None
+            continue
+        best_by_country[iso2] = Candidate(
+            value=best_value[i],
+            period=period,
+            period_sort=best_sort[i],
+            freq_priority=best_freq[i],
+            indicator_priority=best_indicator[i],
+        )
+    return best_by_country
 
-            freq = (row.get("FREQUENCY") or "").strip()
-            freq_pri = FREQ_PRIORITY.get(freq, 0)
-            if freq_pri == 0:
-                continue
 
-            latest = latest_value_in_row(row, time_columns)
-            if latest is None:
-                continue
+def main() -> None:
+    args = parse_args()
+    csv_path = Path(args.csv)
+    out_path = Path(args.out)
 
-            value, period, period_sort = latest
-            candidate = Candidate(
-                value=value,
-                period=period,
-                period_sort=period_sort,
-                freq_priority=freq_pri,
-                indicator_priority=indicator_priority(row.get("INDICATOR") or ""),
-            )
-            best_by_country[iso2] = pick_better(best_by_country[iso2], candidate)
+    header, data_start = read_header(csv_path)
+    # Missing columns read as an empty cell just past the header, so rows
+    # without them behave as DictReader's empty restval did.
+    missing_i = len(header)
+    col_index = {name: i for i, name in enumerate(header)}
+    key_columns = (
+        col_index.get("SERIES_CODE", missing_i),
+        col_index.get("FREQUENCY", missing_i),
+        col_index.get("INDICATOR", missing_i),
+    )
+    width = len(header) + (1 if missing_i in key_columns else 0)
+    time_meta: list[tuple[int, str, int]] = []
+    for i, c in enumerate(header):
+        sort_key = period_sort_key(c)
+        if sort_key is not None:
+            time_meta.append((i, c, sort_key))
+    time_meta.sort(key=lambda meta: meta[2], reverse=True)
+
+    data_end = csv_path.stat().st_size
+    jobs = max(1, min(args.jobs, (data_end - data_start) // MIN_BYTES_PER_JOB))
+    tasks = [
+        (csv_path, start, end, width, key_columns, time_meta)
+        for start, end in byte_ranges(data_start, data_end, jobs)
+    ]
+    if jobs == 1:
+        partials = [scan_range(*tasks[0])]
+    else:
+        with multiprocessing.Pool(jobs) as pool:
+            partials = pool.starmap(scan_range, tasks)
+
+    # Merge in file order so ties resolve to the earliest row, as a single scan would.
+    best_by_country: Dict[str, Optional[Candidate]] = {k: None for k in ISO3_TO_ISO2.values()}
+    for partial in partials:
+        for iso2, candidate in partial.items():
+            if candidate is not None:
+                best_by_country[iso2] = pick_better(best_by_country[iso2], candidate)
 
     output: Dict[str, Optional[dict]] = {}
     for iso2, candidate in best_by_country.items():
@@ -193,7 +294,9 @@ def main() -> None:
             "date": candidate.period,
         }
 
-    out_path.write_text(json.dumps(output, ensure_ascii=False, indent=2) + "\n")
+    with out_path.open("w", encoding="utf-8") as handle:
+        json.dump(output, handle, ensure_ascii=False, indent=2)
+        handle.write("\n")
     covered = sum(1 for v in output.values() if v is not None)
     print(f"Countries with rate data: {covered}/{len(output)}")
     print(f"Wrote: {out_path}")